@@ -1,39 +1,136 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import aiohttp
+from selectolax.lexbor import LexborHTMLParser
 import time
 import json
+import orjson
 import re
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import ollama
 import warnings
+import logging
+import logging.handlers
+import queue
+import atexit
+import sys
+import sqlite3
+import hashlib
+import argparse
 warnings.filterwarnings("ignore")
 
+# Worker threads and coroutines enqueue records; a single listener thread writes them
+log = logging.getLogger('guardian')
+log.setLevel(logging.INFO)
+log.propagate = False
+_log_queue = queue.Queue(-1)
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter('%(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# URL filters for is_valid_article_url, matched against the lowercased URL
+_EXCLUDE_RE = re.compile(
+    r'/(?:live|gallery|video|audio|newsletters|membership|help|info|privacy|terms|contact|jobs'
+    r'|crosswords|games|weather|travel/offers|guardian-live-events)/'
+    r'|\.(?:json|xml|css|js|png|jpg)|#|mailto:|tel:'
+)
+_VALID_RE = re.compile(
+    r'/(?:2024|2025|world|uk-news|politics|business|environment|science|culture'
+    r'|sport|technology|society|education)/'
+)
+
+# Boilerplate paragraphs dropped during content extraction
+_AD_RE = re.compile(r'advertisement|subscribe|premium', re.IGNORECASE)
+
+# URL path fragment -> category, checked in order so the first match wins
+_CATEGORY_PATHS = (
+    ('/world/', 'world'),
+    ('/uk-news/', 'uk'),
+    ('/politics/', 'politics'),
+    ('/business/', 'business'),
+    ('/environment/', 'environment'),
+    ('/science/', 'science'),
+    ('/technology/', 'technology'),
+    ('/culture/', 'culture'),
+    ('/film/', 'culture'),
+    ('/books/', 'culture'),
+    ('/sport/', 'sport'),
+    ('/football/', 'sport'),
+    ('/society/', 'society'),
+    ('/education/', 'education'),
+)
+
+# Articles sent to Ollama in a single batched prompt
+BATCH_SIZE = 4
+
+# Context windows: a single article (800-char excerpt + schema + 150-token reply) fits in
+# 1024 tokens; batches need room for BATCH_SIZE of them. Both are fixed so Ollama only
+# ever switches between two sizes rather than reloading for every prompt length.
+OLLAMA_SINGLE_NUM_CTX = 1024
+OLLAMA_BATCH_NUM_CTX = 1024 * BATCH_SIZE
+
+# In-flight Guardian requests, and retries after a 429/503
+MAX_CONCURRENT_FETCHES = 8
+MAX_FETCH_RETRIES = 3
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _decode_first_json(text, opener='{'):
+    """Decode the first JSON value starting at `opener`, tolerating trailing text"""
+    idx = text.find(opener)
+    if idx == -1:
+        return None
+    try:
+        obj, _ = _JSON_DECODER.raw_decode(text, idx)
+    except ValueError:
+        return None
+    return obj
+
 class GuardianCrawler:
-    def __init__(self, model_name="llama3.2:latest"):
+    def __init__(self, model_name="llama3.2:3b-instruct-q4_K_M"):
         self.base_url = "https://www.theguardian.com"
-        self.session = requests.Session()
         self.lock = threading.Lock()
         self.model_name = model_name
+        self._seen_urls = set()  # article URLs already queued for extraction this crawl
         
-        # Initialize Ollama client
+        # Persistent analysis cache so unchanged articles skip the LLM on re-crawls
+        self._cache_conn = sqlite3.connect('ollama_cache.db', check_same_thread=False)
+        self._cache_conn.execute('CREATE TABLE IF NOT EXISTS c(k BLOB PRIMARY KEY, v TEXT)')
+        self._cache_conn.commit()
+        
+        # Long-lived pool for HTML parsing, reused across categories and crawls
+        self.parse_exec = ThreadPoolExecutor(max_workers=4, thread_name_prefix='guardian-parse')
+        
+        # Initialize Ollama clients - the async one drives concurrent analyses.
+        # Run the server with OLLAMA_NUM_PARALLEL=4 (or higher on capable GPUs) so
+        # requests are served in parallel slots, and OLLAMA_MAX_LOADED_MODELS=1
+        # since only one model is used.
         self.ollama_client = ollama.Client()
+        self.async_client = ollama.AsyncClient()
         
-        # Test Ollama connection
+        # Test Ollama connection by preloading the model with the analysis context size,
+        # so the first articles neither pay the cold start nor trigger a reload
         try:
-            response = self.ollama_client.chat(model=self.model_name, messages=[
-                {'role': 'user', 'content': 'Hello, are you working?'}
-            ])
-            print(f"✅ Ollama connection successful with model: {self.model_name}")
+            self.ollama_client.generate(
+                model=self.model_name,
+                prompt='',
+                options={'num_ctx': OLLAMA_BATCH_NUM_CTX},
+                keep_alive='30m'
+            )
+            log.info(f"✅ Ollama connection successful with model: {self.model_name}")
         except Exception as e:
-            print(f"❌ Ollama connection failed: {e}")
-            print(f"Make sure Ollama is running and the model is installed: ollama run {self.model_name}")
+            log.error(f"❌ Ollama connection failed: {e}")
+            log.error(f"Make sure Ollama is running and the model is installed: ollama run {self.model_name}")
         
         # Enhanced headers to appear more like a real browser
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -44,7 +141,7 @@ class GuardianCrawler:
             'Sec-Fetch-Mode': 'navigate',
             'Sec-Fetch-Site': 'none',
             'Cache-Control': 'max-age=0'
-        })
+        }
         
         # Guardian URL patterns for better article discovery
         self.url_patterns = {
@@ -83,183 +180,169 @@ class GuardianCrawler:
             ]
         }
         
-    def discover_article_urls(self, base_urls, max_per_category=5):
-        """Discover actual article URLs from category pages - PARALLELIZED"""
-        def fetch_single_category(url):
+    async def _fetch(self, session, sem, url, timeout):
+        """GET a page under the concurrency cap, backing off with jitter when throttled"""
+        for attempt in range(MAX_FETCH_RETRIES + 1):
+            async with sem:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    if response.status not in (429, 503) or attempt == MAX_FETCH_RETRIES:
+                        response.raise_for_status()
+                        return await response.read()
+            
+            delay = min(30, 2 ** attempt + random.random())
+            log.info(f"⏳ Throttled on {url}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    async def discover_article_urls(self, session, sem, base_urls, max_per_category=5):
+        """Discover actual article URLs from category pages - ASYNC"""
+        loop = asyncio.get_running_loop()
+        
+        def parse_category_page(url, body):
+            tree = LexborHTMLParser(body)
+            
+            # Guardian-specific selectors for article links
+            link_selectors = [
+                'a[data-link-name="article"]',
+                '.fc-item__link',
+                '.u-faux-block-link__overlay',
+                'a[href*="/2024/"], a[href*="/2025/"]',
+                '.fc-item__content a',
+                '.card__link',
+                '.headline a',
+                'h3 a[href], h4 a[href]',
+                '.fc-item__header a',
+                'a[data-component="LinkTo"]'
+            ]
+            
+            found_links = set()
+            
+            # One combined selector walks the tree once instead of once per selector
+            for link in tree.css(', '.join(link_selectors)):
+                href = link.attributes.get('href')
+                if href:
+                    full_url = urljoin(url, href)
+                    
+                    if self.is_valid_article_url(full_url):
+                        found_links.add(full_url)
+            
+            return list(found_links)[:max_per_category]
+        
+        async def fetch_single_category(url):
             try:
-                print(f"🔍 Discovering articles from: {url}")
-                response = self.session.get(url, timeout=15)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Guardian-specific selectors for article links
-                link_selectors = [
-                    'a[data-link-name="article"]',
-                    '.fc-item__link',
-                    '.u-faux-block-link__overlay',
-                    'a[href*="/2024/"], a[href*="/2025/"]',
-                    '.fc-item__content a',
-                    '.card__link',
-                    '.headline a',
-                    'h3 a[href], h4 a[href]',
-                    '.fc-item__header a',
-                    'a[data-component="LinkTo"]'
-                ]
+                log.info(f"🔍 Discovering articles from: {url}")
+                body = await self._fetch(session, sem, url, timeout=15)
                 
-                found_links = set()
-                
-                for selector in link_selectors:
-                    links = soup.select(selector)
-                    for link in links:
-                        href = link.get('href')
-                        if href:
-                            full_url = urljoin(url, href)
-                            
-                            if self.is_valid_article_url(full_url):
-                                found_links.add(full_url)
-                
-                category_articles = list(found_links)[:max_per_category]
-                print(f"📄 Found {len(category_articles)} articles from {url}")
+                # Parse off the event loop so other fetches keep flowing
+                category_articles = await loop.run_in_executor(self.parse_exec, parse_category_page, url, body)
+                log.info(f"📄 Found {len(category_articles)} articles from {url}")
                 return category_articles
                 
             except Exception as e:
-                print(f"❌ Error discovering articles from {url}: {e}")
+                log.error(f"❌ Error discovering articles from {url}: {e}")
                 return []
         
-        # PARALLELIZED URL DISCOVERY
+        # CONCURRENT URL DISCOVERY
+        results = await asyncio.gather(*[fetch_single_category(url) for url in base_urls])
+        
         all_articles = []
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            future_to_url = {executor.submit(fetch_single_category, url): url for url in base_urls}
-            
-            for future in as_completed(future_to_url):
-                try:
-                    articles = future.result()
-                    all_articles.extend(articles)
-                except Exception as e:
-                    print(f"❌ Error in parallel discovery: {e}")
+        for articles in results:
+            all_articles.extend(articles)
         
         return list(set(all_articles))
     
     def is_valid_article_url(self, url):
         """Check if URL is a valid Guardian article"""
-        if not url or not ('theguardian.com' in url):
+        if not url:
             return False
         
-        exclude_patterns = [
-            '/live/', '/gallery/', '/video/', '/audio/',
-            '/newsletters/', '/membership/', '/help/', '/info/',
-            '/privacy/', '/terms/', '/contact/', '/jobs/',
-            '.json', '.xml', '.css', '.js', '.png', '.jpg',
-            '#', 'mailto:', 'tel:', '/crosswords/', '/games/',
-            '/weather/', '/travel/offers/', '/guardian-live-events/'
-        ]
-        
-        for pattern in exclude_patterns:
-            if pattern in url.lower():
-                return False
-        
-        # Guardian articles typically have year in URL path
-        valid_patterns = [
-            '/2024/', '/2025/', '/world/', '/uk-news/', '/politics/',
-            '/business/', '/environment/', '/science/', '/culture/',
-            '/sport/', '/technology/', '/society/', '/education/'
-        ]
-        
-        return any(pattern in url for pattern in valid_patterns)
+        u = url.lower()
+        # Guardian articles typically have year or section in URL path
+        return 'theguardian.com' in u and not _EXCLUDE_RE.search(u) and bool(_VALID_RE.search(u))
     
-    def extract_content_direct(self, urls):
-        """Direct content extraction using requests and BeautifulSoup"""
-        print(f"🚀 Processing {len(urls)} URLs with direct extraction...")
+    async def extract_content_direct(self, session, sem, urls):
+        """Direct content extraction using aiohttp and selectolax"""
+        log.info(f"🚀 Processing {len(urls)} URLs with direct extraction...")
+        loop = asyncio.get_running_loop()
         
-        def extract_single_article(url):
+        def parse_article(url, body):
+            tree = LexborHTMLParser(body)
+            
+            # Extract title - Guardian specific selectors
+            title_selectors = [
+                'h1[data-gu-name="headline"]',
+                'h1.content__headline',
+                '.content__main h1',
+                'h1.headline',
+                'h1',
+                '.article-header h1'
+            ]
+            
+            title = ""
+            title_elem = tree.css_first(', '.join(title_selectors))
+            if title_elem:
+                title = title_elem.text(strip=True)
+            
+            # Extract content - Guardian specific selectors
+            content_selectors = [
+                '.article-body-commercial-selector p',
+                '.content__article-body p',
+                '[data-gu-name="body"] p',
+                '.article-body p',
+                '.content__main-column p',
+                'div[data-component="body"] p',
+                '.prose p'
+            ]
+            
+            # Only walk the article body subtree when the page has one; otherwise
+            # fall back to a single pass over all paragraph selectors
+            article_body = tree.css_first('[data-gu-name="body"]')
+            paragraphs = article_body.css('p') if article_body is not None else tree.css(', '.join(content_selectors))
+            
+            content_parts = []
+            content_set = set()
+            for elem in paragraphs:
+                text = elem.text(strip=True)
+                # Filter out ads and non-content paragraphs
+                if (len(text) > 20 and text not in content_set and 
+                    not text.startswith('Guardian') and
+                    not _AD_RE.search(text)):
+                    content_parts.append(text)
+                    content_set.add(text)
+            
+            content = ' '.join(content_parts)
+            
+            if len(content) < 100:
+                log.warning(f"⚠️ Content too short for: {url}")
+                return None
+            
+            article = {
+                'url': url,
+                'title': title or "No title found",
+                'content': content[:3000],
+                'extracted_at': datetime.now().isoformat(),
+                'word_count': len(content.split()),
+                'category': self.categorize_url(url)
+            }
+            
+            log.info(f"✅ Extracted: {title[:50]}... ({len(content)} chars)")
+            return article
+        
+        async def extract_single_article(url):
             try:
-                print(f"📖 Processing: {url}")
-                response = self.session.get(url, timeout=20)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
+                log.info(f"📖 Processing: {url}")
+                body = await self._fetch(session, sem, url, timeout=20)
                 
-                # Extract title - Guardian specific selectors
-                title_selectors = [
-                    'h1[data-gu-name="headline"]',
-                    'h1.content__headline',
-                    '.content__main h1',
-                    'h1.headline',
-                    'h1',
-                    '.article-header h1'
-                ]
-                
-                title = ""
-                for selector in title_selectors:
-                    title_elem = soup.select_one(selector)
-                    if title_elem:
-                        title = title_elem.get_text(strip=True)
-                        break
-                
-                # Extract content - Guardian specific selectors
-                content_selectors = [
-                    '.article-body-commercial-selector p',
-                    '.content__article-body p',
-                    '[data-gu-name="body"] p',
-                    '.article-body p',
-                    '.content__main-column p',
-                    'div[data-component="body"] p',
-                    '.prose p'
-                ]
-                
-                content_parts = []
-                for selector in content_selectors:
-                    elements = soup.select(selector)
-                    for elem in elements:
-                        text = elem.get_text(strip=True)
-                        # Filter out ads and non-content paragraphs
-                        if (len(text) > 20 and text not in content_parts and 
-                            not text.startswith('Guardian') and
-                            'advertisement' not in text.lower() and
-                            'subscribe' not in text.lower() and
-                            'premium' not in text.lower()):
-                            content_parts.append(text)
-                    
-                    if len(content_parts) >= 5:  # Get at least 5 paragraphs
-                        break
-                
-                content = ' '.join(content_parts)
-                
-                if len(content) < 100:
-                    print(f"⚠️ Content too short for: {url}")
-                    return None
-                
-                article = {
-                    'url': url,
-                    'title': title or "No title found",
-                    'content': content[:3000],
-                    'extracted_at': datetime.now().isoformat(),
-                    'word_count': len(content.split()),
-                    'category': self.categorize_url(url)
-                }
-                
-                print(f"✅ Extracted: {title[:50]}... ({len(content)} chars)")
-                return article
+                return await loop.run_in_executor(self.parse_exec, parse_article, url, body)
                 
             except Exception as e:
-                print(f"❌ Error extracting {url}: {e}")
+                log.error(f"❌ Error extracting {url}: {e}")
                 return None
         
-        # Process articles with some parallelization but not too aggressive
-        articles = []
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            future_to_url = {executor.submit(extract_single_article, url): url for url in urls}
-            
-            for future in as_completed(future_to_url):
-                try:
-                    article = future.result()
-                    if article:
-                        articles.append(article)
-                except Exception as e:
-                    print(f"❌ Article extraction error: {e}")
+        # Fetch all articles concurrently; the connector bounds open sockets
+        results = await asyncio.gather(*[extract_single_article(url) for url in urls])
+        articles = [article for article in results if article]
         
-        print(f"✅ Successfully extracted {len(articles)} articles")
+        log.info(f"✅ Successfully extracted {len(articles)} articles")
         return articles
     
     def categorize_url(self, url):
@@ -267,33 +350,29 @@ class GuardianCrawler:
         if not url:
             return 'unknown'
         
-        if '/world/' in url:
-            return 'world'
-        elif '/uk-news/' in url:
-            return 'uk'
-        elif '/politics/' in url:
-            return 'politics'
-        elif '/business/' in url:
-            return 'business'
-        elif '/environment/' in url:
-            return 'environment'
-        elif '/science/' in url:
-            return 'science'
-        elif '/technology/' in url:
-            return 'technology'
-        elif '/culture/' in url or '/film/' in url or '/books/' in url:
-            return 'culture'
-        elif '/sport/' in url or '/football/' in url:
-            return 'sport'
-        elif '/society/' in url:
-            return 'society'
-        elif '/education/' in url:
-            return 'education'
-        else:
-            return 'general'
+        return next((label for path, label in _CATEGORY_PATHS if path in url), 'general')
     
-    def analyze_with_ollama_fast(self, content, category):
+    def _cache_key(self, content, category):
+        return hashlib.blake2b(f'{self.model_name}|{category}|'.encode() + content[:800].encode(), digest_size=16).digest()
+    
+    def _cache_get(self, content, category):
+        """Return a cached analysis for this content, or None"""
+        with self.lock:
+            row = self._cache_conn.execute('SELECT v FROM c WHERE k = ?', (self._cache_key(content, category),)).fetchone()
+        return orjson.loads(row[0]) if row else None
+    
+    def _cache_put(self, content, category, analysis):
+        # Committed once per category in process_articles_parallel, not per article
+        with self.lock:
+            self._cache_conn.execute('INSERT OR REPLACE INTO c(k, v) VALUES (?, ?)',
+                                     (self._cache_key(content, category), orjson.dumps(analysis).decode()))
+    
+    async def analyze_with_ollama_fast(self, content, category):
         """OPTIMIZED Ollama analysis"""
+        cached = self._cache_get(content, category)
+        if cached is not None:
+            return cached
+        
         prompt = f"""Analyze this Guardian {category} article briefly. Return only JSON:
 
 Content: {content[:800]}...
@@ -301,36 +380,37 @@ Content: {content[:800]}...
 {{"headline":"Main headline","summary":"Brief summary","key_topics":["topic1","topic2"],"sentiment":"positive/negative/neutral","urgency":"high/medium/low"}}"""
         
         try:
-            response = self.ollama_client.chat(
+            stream = await self.async_client.chat(
                 model=self.model_name,
                 messages=[{'role': 'user', 'content': prompt}],
                 options={
                     'temperature': 0.1, 
-                    'num_predict': 150,
+                    'num_predict': 150,  # hard cap; the stream is also closed at the first complete object
                     'top_k': 10,
-                    'top_p': 0.9
-                }
+                    'top_p': 0.9,
+                    'num_ctx': OLLAMA_SINGLE_NUM_CTX,
+                    'repeat_last_n': 0
+                },
+                keep_alive='30m',
+                stream=True
             )
             
-            response_text = response['message']['content'].strip()
-            
-            # Quick JSON extraction
-            if response_text.startswith('{'):
-                try:
-                    return json.loads(response_text)
-                except:
-                    pass
-            
-            # Fallback JSON extraction
-            json_match = re.search(r'\{[^}]*\}', response_text)
-            if json_match:
-                try:
-                    return json.loads(json_match.group())
-                except:
-                    pass
+            # Stop reading as soon as a complete JSON object has arrived
+            response_text = ''
+            try:
+                async for chunk in stream:
+                    piece = chunk['message']['content']
+                    response_text += piece
+                    if '}' in piece:
+                        analysis = _decode_first_json(response_text)
+                        if analysis is not None:
+                            self._cache_put(content, category, analysis)
+                            return analysis
+            finally:
+                await stream.aclose()
             
         except Exception as e:
-            print(f"❌ Analysis failed for {category}: {e}")
+            log.error(f"❌ Analysis failed for {category}: {e}")
             
         # Fast fallback
         return {
@@ -341,51 +421,109 @@ Content: {content[:800]}...
             "urgency": "medium"
         }
     
-    def process_articles_parallel(self, articles):
-        """PARALLELIZED article processing with Ollama"""
-        print(f"🤖 Analyzing {len(articles)} articles with Ollama...")
+    async def analyze_batch_with_ollama(self, articles):
+        """Analyze several articles in one Ollama call; returns None if the reply can't be mapped back"""
+        numbered = '\n'.join(
+            f"{i}) [{article['category']}] {article['content'][:800]}..."
+            for i, article in enumerate(articles, 1)
+        )
+        prompt = f"""Analyze these {len(articles)} Guardian articles briefly. Return only a JSON array with one object per article, in the same order, each using this schema:
+
+{{"headline":"Main headline","summary":"Brief summary","key_topics":["topic1","topic2"],"sentiment":"positive/negative/neutral","urgency":"high/medium/low"}}
+
+Articles:
+{numbered}"""
+        
+        try:
+            response = await self.async_client.chat(
+                model=self.model_name,
+                messages=[{'role': 'user', 'content': prompt}],
+                options={
+                    'temperature': 0.1, 
+                    'num_predict': 150 * len(articles),
+                    'top_k': 10,
+                    'top_p': 0.9,
+                    'num_ctx': OLLAMA_BATCH_NUM_CTX,
+                    'repeat_last_n': 0
+                },
+                keep_alive='30m'
+            )
+            
+            response_text = response['message']['content'].strip()
+            
+            analyses = _decode_first_json(response_text, opener='[')
+            if (isinstance(analyses, list) and len(analyses) == len(articles) and
+                    all(isinstance(a, dict) for a in analyses)):
+                return analyses
+            
+        except Exception as e:
+            log.error(f"❌ Batch analysis failed: {e}")
+        
+        return None
+    
+    async def process_articles_parallel(self, articles):
+        """CONCURRENT article processing with Ollama"""
+        log.info(f"🤖 Analyzing {len(articles)} articles with Ollama...")
         
-        def analyze_single_article(article):
+        def merge_analysis(article, analysis):
+            article['ai_analysis'] = analysis
+            
+            if not article.get('title') and analysis.get('headline'):
+                article['title'] = analysis['headline']
+            
+            article['summary'] = analysis.get('summary', '')
+            article['topics'] = analysis.get('key_topics', [])
+            article['sentiment'] = analysis.get('sentiment', 'neutral')
+            article['urgency'] = analysis.get('urgency', 'medium')
+            
+            log.info(f"✅ Analyzed: {article.get('title', 'Untitled')[:50]}...")
+            return article
+        
+        async def analyze_single_article(article):
             try:
-                analysis = self.analyze_with_ollama_fast(article['content'], article['category'])
-                
-                # Merge analysis with article
-                article['ai_analysis'] = analysis
-                
-                if not article.get('title') and analysis.get('headline'):
-                    article['title'] = analysis['headline']
-                
-                article['summary'] = analysis.get('summary', '')
-                article['topics'] = analysis.get('key_topics', [])
-                article['sentiment'] = analysis.get('sentiment', 'neutral')
-                article['urgency'] = analysis.get('urgency', 'medium')
-                
-                print(f"✅ Analyzed: {article.get('title', 'Untitled')[:50]}...")
-                return article
+                analysis = await self.analyze_with_ollama_fast(article['content'], article['category'])
+                return merge_analysis(article, analysis)
             except Exception as e:
-                print(f"❌ Analysis error: {e}")
+                log.error(f"❌ Analysis error: {e}")
                 return article
         
-        # Process with limited parallelization for Ollama stability
-        processed_articles = []
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            future_to_article = {executor.submit(analyze_single_article, article): article for article in articles}
+        async def analyze_batch(batch):
+            if len(batch) > 1:
+                analyses = await self.analyze_batch_with_ollama(batch)
+                if analyses is not None:
+                    for article, analysis in zip(batch, analyses):
+                        self._cache_put(article['content'], article['category'], analysis)
+                    return [merge_analysis(article, analysis) for article, analysis in zip(batch, analyses)]
+                log.warning(f"⚠️ Batch of {len(batch)} could not be mapped back, analyzing individually")
             
-            for future in as_completed(future_to_article):
-                try:
-                    processed_article = future.result()
-                    processed_articles.append(processed_article)
-                except Exception as e:
-                    print(f"❌ Processing error: {e}")
+            return await asyncio.gather(*[analyze_single_article(article) for article in batch])
+        
+        # Cache hits skip the model entirely
+        processed_articles = []
+        pending = []
+        for article in articles:
+            cached = self._cache_get(article['content'], article['category'])
+            if cached is not None:
+                processed_articles.append(merge_analysis(article, cached))
+            else:
+                pending.append(article)
         
+        # Submit every batch at once; Ollama schedules them across its parallel slots
+        batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+        results = await asyncio.gather(*[analyze_batch(batch) for batch in batches])
+        
+        processed_articles.extend(article for batch in results for article in batch)
+        
+        # One commit for the whole category's new cache entries
+        with self.lock:
+            self._cache_conn.commit()
         return processed_articles
     
     def calculate_sentiment_distribution(self, articles):
         """Calculate sentiment distribution"""
-        sentiments = [a.get('sentiment', 'neutral') for a in articles if a.get('sentiment')]
-        
         distribution = {'positive': 0, 'negative': 0, 'neutral': 0}
-        for sentiment in sentiments:
+        for article in articles:
+            sentiment = article.get('sentiment')
             if sentiment in distribution:
                 distribution[sentiment] += 1
         
@@ -393,50 +531,50 @@ Content: {content[:800]}...
     
     def extract_top_topics(self, articles):
         """Extract most common topics"""
-        all_topics = []
+        topic_counter = Counter()
         for article in articles:
-            topics = article.get('topics', [])
-            all_topics.extend(topics)
-        
-        topic_counts = {}
-        for topic in all_topics:
-            topic_counts[topic] = topic_counts.get(topic, 0) + 1
+            topic_counter.update(article.get('topics', ()))
         
-        return sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        return topic_counter.most_common(10)
     
     def generate_summary(self, all_articles):
         """Generate comprehensive summary"""
         if not all_articles:
             return {}
         
-        sentiments = [a.get('sentiment', 'neutral') for a in all_articles]
-        sentiment_dist = {'positive': 0, 'negative': 0, 'neutral': 0}
-        for s in sentiments:
-            if s in sentiment_dist:
-                sentiment_dist[s] += 1
-        
-        all_topics = []
+        # Single pass over all articles
+        sentiment_counter = Counter()
+        topic_counter = Counter()
+        categories = set()
+        total_words = 0
         for article in all_articles:
-            all_topics.extend(article.get('topics', []))
+            sentiment_counter[article.get('sentiment', 'neutral')] += 1
+            topic_counter.update(article.get('topics', ()))
+            categories.add(article.get('category', 'unknown'))
+            total_words += article.get('word_count', 0)
         
         return {
             'total_articles': len(all_articles),
-            'total_categories': len(set(a.get('category', 'unknown') for a in all_articles)),
-            'avg_word_count': sum(a.get('word_count', 0) for a in all_articles) / len(all_articles) if all_articles else 0,
-            'global_sentiment': sentiment_dist,
-            'unique_topics': len(set(all_topics)),
-            'all_topics': list(set(all_topics))[:20]
+            'total_categories': len(categories),
+            'avg_word_count': total_words / len(all_articles),
+            'global_sentiment': {s: sentiment_counter[s] for s in ('positive', 'negative', 'neutral')},
+            'unique_topics': len(topic_counter),
+            'all_topics': [topic for topic, _ in topic_counter.most_common(20)]
         }
     
     def crawl_all_content(self):
         """Main crawling function"""
-        print("📰 Starting Guardian Crawler")
+        return asyncio.run(self._crawl_all_async())
+    
+    async def _crawl_all_async(self):
+        """Crawl every category over a single shared aiohttp session"""
+        log.info("📰 Starting Guardian Crawler")
         
         all_data = {
             'crawl_metadata': {
                 'started': datetime.now().isoformat(),
                 'source': 'The Guardian',
-                'method': 'Direct Requests + BeautifulSoup + Ollama',
+                'method': 'aiohttp + selectolax + Ollama',
                 'model_used': self.model_name,
                 'version': '1.0-GUARDIAN'
             },
@@ -447,48 +585,60 @@ Content: {content[:800]}...
         
         total_articles = []
         
-        # Process each category
-        for category, urls in self.url_patterns.items():
-            print(f"\n🏷️ Processing {category.upper()} category...")
-            
-            try:
-                # Discover article URLs
-                article_urls = self.discover_article_urls(urls, max_per_category=5)
-                
-                if not article_urls:
-                    print(f"⚠️ No articles found for {category}")
-                    continue
-                
-                print(f"📄 Found {len(article_urls)} URLs for {category}")
-                
-                # Direct content extraction
-                articles = self.extract_content_direct(article_urls)
+        # Dedup is per crawl; a repeat crawl on the same crawler starts fresh
+        self._seen_urls.clear()
+        
+        # Caps in-flight requests for this crawl; created here so it belongs to this run's loop
+        sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        connector = aiohttp.TCPConnector(limit=20, limit_per_host=10, ttl_dns_cache=300)
+        
+        async with aiohttp.ClientSession(connector=connector, headers=self.headers) as session:
+            # Process each category
+            for category, urls in self.url_patterns.items():
+                log.info(f"\n🏷️ Processing {category.upper()} category...")
                 
-                if articles:
-                    # AI processing
-                    processed_articles = self.process_articles_parallel(articles)
+                try:
+                    # Discover article URLs
+                    article_urls = await self.discover_article_urls(session, sem, urls, max_per_category=5)
                     
-                    # Store category data
-                    category_data = {
-                        'category_name': category,
-                        'total_articles': len(processed_articles),
-                        'articles': processed_articles,
-                        'statistics': {
-                            'avg_word_count': sum(a.get('word_count', 0) for a in processed_articles) / len(processed_articles) if processed_articles else 0,
-                            'sentiment_distribution': self.calculate_sentiment_distribution(processed_articles),
-                            'top_topics': self.extract_top_topics(processed_articles)
-                        }
-                    }
+                    # Skip articles already picked up under an overlapping section
+                    article_urls = [u for u in article_urls if u not in self._seen_urls]
+                    self._seen_urls.update(article_urls)
                     
-                    all_data['categories'][category] = category_data
-                    total_articles.extend(processed_articles)
+                    if not article_urls:
+                        log.warning(f"⚠️ No articles found for {category}")
+                        continue
                     
-                    print(f"✅ {category}: {len(processed_articles)} articles processed")
-                
-            except Exception as e:
-                print(f"❌ Error processing {category}: {e}")
-                continue
-        
+                    log.info(f"📄 Found {len(article_urls)} URLs for {category}")
+                    
+                    # Direct content extraction
+                    articles = await self.extract_content_direct(session, sem, article_urls)
+                    
+                    if articles:
+                        # AI processing
+                        processed_articles = await self.process_articles_parallel(articles)
+                        
+                        # Store category data
+                        category_data = {
+                            'category_name': category,
+                            'total_articles': len(processed_articles),
+                            'articles': processed_articles,
+                            'statistics': {
+                                'avg_word_count': sum(a.get('word_count', 0) for a in processed_articles) / len(processed_articles) if processed_articles else 0,
+                                'sentiment_distribution': self.calculate_sentiment_distribution(processed_articles),
+                                'top_topics': self.extract_top_topics(processed_articles)
+                            }
+                        }
+                        
+                        all_data['categories'][category] = category_data
+                        total_articles.extend(processed_articles)
+                        
+                        log.info(f"✅ {category}: {len(processed_articles)} articles processed")
+                    
+                except Exception as e:
+                    log.error(f"❌ Error processing {category}: {e}")
+                    continue
+            
         # Generate final summary
         all_data['all_articles'] = total_articles
         all_data['summary'] = self.generate_summary(total_articles)
@@ -497,66 +647,101 @@ Content: {content[:800]}...
         
         return all_data
     
+    def close(self):
+        """Shut down the parse pool and the analysis cache"""
+        self.parse_exec.shutdown(wait=True)
+        self._cache_conn.commit()
+        self._cache_conn.close()
+    
     def save_data(self, data, filename='guardian_crawl_data.json'):
         """Save data to JSON file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            print(f"\n💾 Data saved to {filename}")
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            log.info(f"\n💾 Data saved to {filename}")
             return True
         except Exception as e:
-            print(f"❌ Error saving data: {e}")
+            log.error(f"❌ Error saving data: {e}")
             return False
     
-    def print_results(self, data):
-        """Print results summary and complete JSON"""
-        print("\n" + "="*80)
-        print("📰 THE GUARDIAN CRAWL RESULTS")
-        print("="*80)
+    def print_results(self, data, verbose=False, filename=None):
+        """Print results summary, and the complete JSON when verbose
+
+        `filename` is the file save_data actually wrote, if any; it is only pointed to then.
+        """
+        log.info("\n" + "="*80)
+        log.info("📰 THE GUARDIAN CRAWL RESULTS")
+        log.info("="*80)
         
         if not data:
-            print("❌ No data available")
+            log.error("❌ No data available")
             return
         
         # Print summary
         summary = data.get('summary', {})
-        print(f"📊 Total Articles: {summary.get('total_articles', 0)}")
-        print(f"🏷️ Categories: {summary.get('total_categories', 0)}")
-        print(f"📝 Avg Words: {summary.get('avg_word_count', 0):.0f}")
+        log.info(f"📊 Total Articles: {summary.get('total_articles', 0)}")
+        log.info(f"🏷️ Categories: {summary.get('total_categories', 0)}")
+        log.info(f"📝 Avg Words: {summary.get('avg_word_count', 0):.0f}")
         
         categories = data.get('categories', {})
         for cat_name, cat_data in categories.items():
-            print(f"   📂 {cat_name.upper()}: {cat_data.get('total_articles', 0)} articles")
+            log.info(f"   📂 {cat_name.upper()}: {cat_data.get('total_articles', 0)} articles")
+        
+        if not verbose:
+            if filename:
+                log.info(f"\n📄 Full JSON is saved to {filename} (view it with: jq . {filename})")
+            return
         
         # Print complete JSON
-        print("\n" + "="*80)
-        print("📄 COMPLETE JSON OUTPUT")
-        print("="*80)
-        print(json.dumps(data, indent=2, ensure_ascii=False))
+        log.info("\n" + "="*80)
+        log.info("📄 COMPLETE JSON OUTPUT")
+        log.info("="*80)
+        
+        # The payload can be megabytes: write orjson's bytes straight to stdout rather than
+        # through the logger, after draining the queue so the banner comes out first
+        _log_listener.stop()
+        _log_listener.start()
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
 
 # Usage
 if __name__ == "__main__":
-    print("📰 The Guardian News Crawler - Quality journalism at your fingertips!")
+    parser = argparse.ArgumentParser(description="The Guardian News Crawler")
+    parser.add_argument('--model', default="llama3.2:3b-instruct-q4_K_M",
+                        help="Ollama model to use (e.g. a q8_0 tag for quality runs)")
+    parser.add_argument('--verbose', action='store_true',
+                        help="Also print the complete JSON output to the terminal")
+    args = parser.parse_args()
     
-    crawler = GuardianCrawler(model_name="llama3.2:latest")
+    log.info("📰 The Guardian News Crawler - Quality journalism at your fingertips!")
+    
+    crawler = GuardianCrawler(model_name=args.model)
     
     # Run the crawler
-    data = crawler.crawl_all_content()
+    try:
+        data = crawler.crawl_all_content()
+    finally:
+        crawler.close()
     
     if data and data.get('summary', {}).get('total_articles', 0) > 0:
-        # Print results and JSON
-        crawler.print_results(data)
+        output_file = 'guardian_crawl_data.json'
+        
+        # Save data first, so the results only point at a file that exists
+        saved = crawler.save_data(data, output_file)
         
-        # Save data
-        crawler.save_data(data, 'guardian_crawl_data.json')
+        # Print results (and JSON when verbose)
+        crawler.print_results(data, verbose=args.verbose, filename=output_file if saved else None)
         
-        print(f"\n✅ Guardian crawling completed successfully!")
-        print(f"💾 File saved: guardian_crawl_data.json")
+        log.info(f"\n✅ Guardian crawling completed successfully!")
+        if saved:
+            log.info(f"💾 File saved: {output_file}")
         
     else:
-        print("❌ No articles were successfully extracted.")
-        print("Possible issues:")
-        print("- Network connectivity")
-        print("- Guardian website blocking requests")
-        print("- Ollama not running")
-        print("- Try running: ollama run llama3.2:latest")
\ No newline at end of file
+        log.error("❌ No articles were successfully extracted.")
+        log.info("Possible issues:")
+        log.info("- Network connectivity")
+        log.info("- Guardian website blocking requests")
+        log.info("- Ollama not running")
+        log.info(f"- Try running: ollama run {args.model}")
\ No newline at end of file
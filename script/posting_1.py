@@ -1,24 +1,195 @@
+import re
 import json
 import time
+import copy
+import queue
+import atexit
 import logging
+import logging.handlers
 import asyncio
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
-from typing import List, Dict, Optional
+from playwright.async_api import async_playwright, expect, Page, Browser, BrowserContext, Locator
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from typing import Iterator, List, Dict, Optional, Tuple
+import os
 import random
+import itertools
+import unicodedata
+import ijson
+from dataclasses import dataclass
 
-# Configure logging with UTF-8 encoding to fix Windows Unicode issues
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('twitter_bot.log', encoding='utf-8'),
-        logging.StreamHandler()
+class _FileFormatter(logging.Formatter):
+    """Drop the console status icons so the log file stays plain ASCII"""
+    def format(self, record):
+        return super().format(record).replace("✅ ", "").replace("❌ ", "")
+
+class _RawQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records unformatted; the listener's handlers format them on its own thread"""
+    def prepare(self, record):
+        return copy.copy(record)
+
+# Formatting and both sinks (console and file) run on the listener thread, off the event loop
+_LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(logging.Formatter(_LOG_FORMAT))
+_file_handler = logging.FileHandler('twitter_bot.log', encoding='utf-8')
+_file_handler.setFormatter(_FileFormatter(_LOG_FORMAT))
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _console_handler, _file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logging.root.setLevel(logging.INFO)
+logging.root.addHandler(_RawQueueHandler(_log_queue))
+logger = logging.getLogger(__name__)
+
+def _account_slug(username: str) -> str:
+    """Filesystem-safe form of the account name, used to keep each account's session files apart"""
+    return re.sub(r"[^\w.@-]", "_", username)
+
+_TWEET_LIMIT = 280
+
+def _char_weight(ch: str) -> int:
+    """Twitter's weighted length: Latin, punctuation and similar count 1, everything else (CJK, emoji) 2"""
+    cp = ord(ch)
+    if cp <= 0x10FF or 0x2000 <= cp <= 0x200D or 0x2010 <= cp <= 0x201F or 0x2032 <= cp <= 0x2037:
+        return 1
+    return 2
+
+def _trim(text: str, limit: int = _TWEET_LIMIT) -> str:
+    """Truncate text to Twitter's weighted limit, so the compose box never has to cut it itself"""
+    if sum(map(_char_weight, text)) <= limit:
+        return text
+    used = 0
+    for end, ch in enumerate(text):
+        used += _char_weight(ch)
+        if used > limit - 3:
+            return text[:end] + "..."
+    return text
+
+_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+_VIEWPORT = {"width": 1920, "height": 1080}
+
+def _launch_args(headless: bool) -> List[str]:
+    """Chromium flags trimmed for automation; sandbox/shm workarounds only inside containers"""
+    args = [
+        "--disable-blink-features=AutomationControlled",
+        "--disable-background-networking",
+        "--disable-backgrounding-occluded-windows",
+        "--disable-renderer-backgrounding",
+        "--disable-features=Translate,BackForwardCache,MediaRouter,AcceptCHFrame,AutoExpandDetailsElement",
+        "--disk-cache-size=33554432",
+        "--mute-audio",
+        "--blink-settings=imagesEnabled=false"
     ]
+    in_container = os.path.exists("/.dockerenv")
+    if in_container:
+        args += ["--no-sandbox", "--disable-dev-shm-usage"]
+    if headless:
+        args += ["--disable-gpu", "--disable-software-rasterizer"]
+        # Chromium only accepts --no-zygote with the sandbox disabled
+        if in_container:
+            args.append("--no-zygote")
+    return args
+
+# Requests that posting never needs; stylesheets stay allowed so the compose box lays out
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+_BLOCKED_HOSTS = ("google-analytics", "doubleclick", "ads-twitter", "branch.io")
+
+async def _block_unneeded_requests(route):
+    """Abort media, fonts and tracker requests; let everything else through"""
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(h in request.url for h in _BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+# Selectors probed when posting, in order of preference
+_COMPOSE_SELECTOR = '[data-testid="tweetTextarea_0"]'
+_NEW_TWEET_BUTTON = '[data-testid="SideNav_NewTweet_Button"]'
+_POST_BTN_SELECTORS = (
+    '[data-testid="tweetButtonInline"]',
+    '[data-testid="tweetButton"]',
+    'button[data-testid="tweetButtonInline"]',
+    'button[data-testid="tweetButton"]',
+    '[role="button"][data-testid="tweetButtonInline"]',
+    '[role="button"][data-testid="tweetButton"]'
+)
+_COMPOSE_SELECTORS_ALT = (
+    '[placeholder="What is happening?!"]',
+    '[placeholder="What\'s happening?"]',
+    '[aria-label="Tweet text"]',
+    '.public-DraftEditor-content',
+    '[contenteditable="true"]'
+)
+_POST_BTN_SELECTORS_ALT = (
+    'button[data-testid="tweetButtonInline"]',
+    'button[data-testid="tweetButton"]',
+    'xpath=//button[contains(text(), "Post")]',
+    'xpath=//button[contains(text(), "Tweet")]',
+    'xpath=//*[@role="button" and contains(text(), "Post")]',
+    'xpath=//*[@role="button" and contains(text(), "Tweet")]'
+)
+_COMPOSE_SELECTORS_ANY = (
+    '[data-testid="tweetTextarea_0"]',
+    '[placeholder*="What"]',
+    '[contenteditable="true"]'
+)
+
+# Twitter's web GraphQL mutation for posting; the query id rotates with web client releases
+_CREATE_TWEET_QUERY_ID = "SoVnbfCycZ7fERGCwpZkYA"
+_CREATE_TWEET_URL = f"https://x.com/i/api/graphql/{_CREATE_TWEET_QUERY_ID}/CreateTweet"
+# CreateTweet rejects requests with missing or null feature flags; these mirror the web client.
+# If Twitter reports a new one as missing, add it here.
+_CREATE_TWEET_FEATURES: Dict[str, bool] = {
+    "communities_web_enable_tweet_community_results_fetch": True,
+    "c9s_tweet_anatomy_moderator_badge_enabled": True,
+    "tweetypie_unmention_optimization_enabled": True,
+    "responsive_web_edit_tweet_api_enabled": True,
+    "graphql_is_translatable_rweb_tweet_is_translatable_enabled": True,
+    "view_counts_everywhere_api_enabled": True,
+    "longform_notetweets_consumption_enabled": True,
+    "responsive_web_twitter_article_tweet_consumption_enabled": True,
+    "tweet_awards_web_tipping_enabled": False,
+    "creator_subscriptions_quote_tweet_preview_enabled": False,
+    "longform_notetweets_rich_text_read_enabled": True,
+    "longform_notetweets_inline_media_enabled": True,
+    "articles_preview_enabled": True,
+    "rweb_video_timestamps_enabled": True,
+    "rweb_tipjar_consumption_enabled": True,
+    "responsive_web_graphql_exclude_directive_enabled": True,
+    "verified_phone_label_enabled": False,
+    "freedom_of_speech_not_reach_fetch_enabled": True,
+    "standardized_nudges_misinfo": True,
+    "tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled": True,
+    "responsive_web_graphql_skip_user_profile_image_extensions_enabled": False,
+    "responsive_web_graphql_timeline_navigation_enabled": True,
+    "responsive_web_enhance_cards_enabled": False,
+}
+
+@dataclass(frozen=True)
+class Strategy:
+    """One way of getting a tweet posted: where to type it and how to submit it"""
+    name: str
+    compose: Tuple[str, ...]
+    post_button: Tuple[str, ...] = ()  # empty - submit with the Ctrl+Enter shortcut
+
+@dataclass
+class Tweet:
+    """A tweet ready to send: NFC-normalized and already trimmed to the length limit"""
+    __slots__ = ("text",)
+    text: str
+
+# Tried in order; the keyboard shortcut is cheapest, so it goes first
+STRATEGIES = (
+    Strategy(name="keyboard shortcut", compose=_COMPOSE_SELECTORS_ANY),
+    Strategy(name="standard compose box", compose=(_COMPOSE_SELECTOR,), post_button=_POST_BTN_SELECTORS),
+    Strategy(name="alternative selectors", compose=_COMPOSE_SELECTORS_ALT, post_button=_POST_BTN_SELECTORS_ALT),
 )
-logger = logging.getLogger(__name__)
 
 class TwitterBot:
-    def __init__(self, username: str, password: str, headless: bool = False):
+    def __init__(self, username: str, password: str, headless: bool = False,
+                 user_data_dir: Optional[str] = ".pw_profile", api_bearer_token: Optional[str] = None,
+                 cdp_endpoint: Optional[str] = None, state_file: Optional[str] = None):
         """
         Initialize the Twitter bot
         
@@ -26,403 +197,557 @@ class TwitterBot:
             username: Your Twitter username/email
             password: Your Twitter password
             headless: Run browser in headless mode (default: False for debugging)
+            user_data_dir: Base directory for persistent browser profiles, so the login
+                survives restarts; each account gets its own subdirectory
+                (default: ".pw_profile"; None for a fresh browser each run)
+            api_bearer_token: Bearer token of Twitter's web client; when set, tweets are
+                posted straight to the CreateTweet API, with the UI as fallback
+            cdp_endpoint: DevTools URL of a shared Chromium (see serve_shared_browser), e.g.
+                "http://localhost:9222"; when set, the bot connects to it instead of
+                launching its own browser and ignores user_data_dir
+            state_file: Where the saved session (cookies/local storage) is kept, so a
+                restart without a persistent profile skips the login flow
+                (default: "twitter_state_<username>.json"); only used when neither
+                user_data_dir nor cdp_endpoint is set
         """
         self.username = username
         self.password = password
         self.headless = headless
+        self.user_data_dir = os.path.join(user_data_dir, _account_slug(username)) if user_data_dir else None
+        # Only the fresh-browser mode reads the file back, so don't copy live cookies to disk otherwise
+        if user_data_dir or cdp_endpoint:
+            self.state_file = None
+        else:
+            self.state_file = state_file or f"twitter_state_{_account_slug(username)}.json"
+        self.api_bearer_token = api_bearer_token
+        self.cdp_endpoint = cdp_endpoint
         self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
-        self.page: Optional[Page] = None
+        self.contexts: List[BrowserContext] = []
+        self._unused_pages: List[Page] = []  # blank tab(s) a persistent context opens with
+        self.storage_state: Optional[Dict] = None
+        self._saved_auth: Dict[Tuple[str, str], str] = {}
         self.playwright = None
+        self._loc_cache: Dict[Tuple[int, object], Locator] = {}
         
     async def setup_browser(self):
-        """Setup Playwright browser with optimal settings"""
+        """Setup the single Playwright browser shared by all workers"""
         try:
             self.playwright = await async_playwright().start()
             
-            # Launch browser with options
-            self.browser = await self.playwright.chromium.launch(
-                headless=self.headless,
-                args=[
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-extensions",
-                    "--disable-plugins"
-                ]
-            )
-            
-            # Create context with realistic user agent and viewport
-            self.context = await self.browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-                locale="en-US"
-            )
-            
-            # Create page
-            self.page = await self.context.new_page()
-            
-            # Add script to remove webdriver property
-            await self.page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            # Set default timeout
-            self.page.set_default_timeout(30000)  # 30 seconds
+            if self.cdp_endpoint:
+                # Attach to the shared browser; each worker still gets its own context
+                self.browser = await self.playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+            elif self.user_data_dir:
+                # Persistent profile - cookies and storage survive across runs
+                context = await self.playwright.chromium.launch_persistent_context(
+                    user_data_dir=self.user_data_dir,
+                    headless=self.headless,
+                    args=_launch_args(self.headless),
+                    user_agent=_USER_AGENT,
+                    viewport=_VIEWPORT,
+                    locale="en-US"
+                )
+                self.contexts.append(context)
+                self._unused_pages = list(context.pages)
+                
+                # Skip images, media, fonts and analytics beacons
+                await context.route("**/*", _block_unneeded_requests)
+            else:
+                # Launch browser with options
+                self.browser = await self.playwright.chromium.launch(
+                    headless=self.headless,
+                    args=_launch_args(self.headless)
+                )
             
             logger.info("Playwright browser initialized successfully")
             
         except Exception as e:
-            logger.error(f"Failed to initialize browser: {e}")
+            logger.error("Failed to initialize browser: %s", e)
             raise
     
-    async def login_to_twitter(self):
-        """Login to Twitter account"""
+    async def _make_worker_context(self) -> Tuple[BrowserContext, Page]:
+        """
+        Create the browser context and page for one posting worker
+        
+        With a persistent profile every worker gets its own page in the shared
+        context. Otherwise each worker gets an isolated context; contexts created
+        after login reuse the captured storage state, so only the first one has
+        to go through the login flow; before login the state saved by a previous
+        run is used when it exists.
+        
+        Returns:
+            Tuple of the worker's context and its page
+        """
+        if self.user_data_dir and not self.cdp_endpoint:
+            context = self.contexts[0]
+        else:
+            # Create context with realistic user agent and viewport
+            context = await self.browser.new_context(
+                user_agent=_USER_AGENT,
+                viewport=_VIEWPORT,
+                locale="en-US",
+                storage_state=self.storage_state or (self.state_file if self.state_file and os.path.exists(self.state_file) else None)
+            )
+            self.contexts.append(context)
+            
+            # Skip images, media, fonts and analytics beacons
+            await context.route("**/*", _block_unneeded_requests)
+        
+        # Reuse the persistent context's initial tab rather than leaving it open and blank
+        page = self._unused_pages.pop() if self._unused_pages else await context.new_page()
+        
+        # Add script to remove webdriver property
+        await page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        
+        # Set default timeout
+        page.set_default_timeout(30000)  # 30 seconds
+        
+        return context, page
+    
+    async def login_to_twitter(self, page: Page):
+        """Login to Twitter account, unless the browser profile is already signed in"""
         try:
+            # Reuse the saved session when there is one
+            try:
+                await self._open_home(page, timeout=10000)
+                logger.info("Already logged in, skipping login flow")
+                return
+            except PlaywrightError:
+                # Timed out, or the navigation was aborted by the redirect to the login flow
+                pass
+            
             logger.info("Navigating to Twitter login page...")
-            await self.page.goto("https://twitter.com/i/flow/login")
+            await page.goto("https://twitter.com/i/flow/login", wait_until="domcontentloaded")
             
             # Wait for and fill username
             logger.info("Waiting for username field...")
-            await self.page.wait_for_selector('input[autocomplete="username"]', timeout=20000)
-            username_field = self.page.locator('input[autocomplete="username"]')
+            await page.wait_for_selector('input[autocomplete="username"]', timeout=20000)
+            username_field = page.locator('input[autocomplete="username"]')
             await username_field.clear()
             await username_field.fill(self.username)
             
             # Click Next button
-            next_button = self.page.locator('xpath=//span[text()="Next"]')
+            next_button = page.locator('xpath=//span[text()="Next"]')
             await next_button.click()
             
             # Wait for password field
             logger.info("Waiting for password field...")
-            await asyncio.sleep(2)  # Small delay to ensure page loads
-            
-            await self.page.wait_for_selector('input[name="password"]', timeout=20000)
-            password_field = self.page.locator('input[name="password"]')
+            await page.wait_for_selector('input[name="password"]', state="visible", timeout=20000)
+            password_field = page.locator('input[name="password"]')
             await password_field.clear()
             await password_field.fill(self.password)
             
             # Click Login button
-            login_button = self.page.locator('xpath=//span[text()="Log in"]')
+            login_button = page.locator('xpath=//span[text()="Log in"]')
             await login_button.click()
             
             # Wait for successful login (check for home timeline)
             logger.info("Waiting for login to complete...")
-            await self.page.wait_for_selector('[data-testid="primaryColumn"]', timeout=30000)
+            await page.wait_for_url("**/home", timeout=30000)
+            await page.wait_for_selector('[data-testid="primaryColumn"]', timeout=30000)
             
             logger.info("Successfully logged into Twitter!")
-            await asyncio.sleep(3)  # Additional wait to ensure full page load
+            await self._open_home(page)
             
         except Exception as e:
-            logger.error(f"Login failed: {e}")
+            logger.error("Login failed: %s", e)
             raise
     
-    async def post_tweet(self, tweet_text: str) -> bool:
+    async def _open_home(self, page: Page, timeout: float = 30000):
+        """Load the home timeline once; workers then post from it without navigating again"""
+        # Only the DOM is needed, so wait for the compose UI alongside navigation instead of the load event
+        results = await asyncio.gather(
+            page.goto("https://twitter.com/home", wait_until="domcontentloaded"),
+            page.wait_for_selector(f"{_COMPOSE_SELECTOR}, {_NEW_TWEET_BUTTON}", timeout=timeout),
+            return_exceptions=True
+        )
+        # Let both finish so neither leaves an unretrieved exception behind, then surface the first error
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+    
+    async def _auth_cookies(self, context: BrowserContext) -> Dict[Tuple[str, str], str]:
+        """The session's auth_token/ct0 values, keyed by (domain, name)"""
+        return {
+            (c["domain"], c["name"]): c["value"]
+            for c in await context.cookies()
+            if c["name"] in ("auth_token", "ct0")
+        }
+    
+    async def post_tweet_api(self, context: BrowserContext, tweet_text: str) -> bool:
         """
-        Post a tweet to Twitter with multiple fallback methods
+        Post a tweet through the CreateTweet GraphQL endpoint using the session cookies
         
         Args:
+            context: A logged-in browser context
             tweet_text: The text content of the tweet
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if Twitter accepted the tweet, False otherwise
         """
         try:
-            logger.info(f"Posting tweet: {tweet_text[:50]}...")
-            
-            # Navigate to home if not already there
-            if "home" not in self.page.url:
-                await self.page.goto("https://twitter.com/home")
-                await asyncio.sleep(3)
+            # The CSRF token must come from the domain the request goes to
+            cookies = await context.cookies("https://x.com")
+            ct0 = next((c["value"] for c in cookies if c["name"] == "ct0"), None)
+            if not ct0:
+                logger.warning("No ct0 cookie in session, cannot post via API")
+                return False
             
-            # Method 1: Try the standard compose box
-            success = await self._try_compose_method_1(tweet_text)
-            if success:
-                return True
+            payload = {
+                "variables": {
+                    "tweet_text": tweet_text,
+                    "media": {"media_entities": [], "possibly_sensitive": False},
+                    "semantic_annotation_ids": []
+                },
+                "queryId": _CREATE_TWEET_QUERY_ID,
+                "features": _CREATE_TWEET_FEATURES
+            }
+            response = await context.request.post(
+                _CREATE_TWEET_URL,
+                headers={
+                    "authorization": f"Bearer {self.api_bearer_token}",
+                    "x-csrf-token": ct0,
+                    "content-type": "application/json"
+                },
+                data=json.dumps(payload)
+            )
             
-            # Method 2: Try alternative selectors
-            success = await self._try_compose_method_2(tweet_text)
-            if success:
-                return True
+            if not response.ok:
+                logger.warning("CreateTweet API returned HTTP %s", response.status)
+                return False
             
-            # Method 3: Try using keyboard shortcuts
-            success = await self._try_compose_method_3(tweet_text)
-            if success:
-                return True
+            # GraphQL reports failures in the body with a 200 status
+            body = await response.json()
+            if body.get("errors"):
+                message = str(body['errors'][0].get('message', body['errors']))
+                logger.warning("CreateTweet API error: %s", message)
+                if "features" in message:
+                    # Every later call would fail the same way - stick to the UI for this run
+                    logger.warning("Feature flags out of date, disabling the API path; update _CREATE_TWEET_FEATURES")
+                    self.api_bearer_token = None
+                return False
             
-            logger.error("All posting methods failed")
-            return False
+            logger.info("Posted via CreateTweet API")
+            return True
             
         except Exception as e:
-            logger.error(f"Failed to post tweet: {e}")
+            logger.error("CreateTweet API call failed: %s", e)
             return False
     
-    async def _try_compose_method_1(self, tweet_text: str) -> bool:
-        """Method 1: Standard compose box"""
-        try:
-            logger.info("Trying compose method 1...")
-            
-            # Find and click the tweet compose area
-            tweet_compose = self.page.locator('[data-testid="tweetTextarea_0"]')
-            await tweet_compose.wait_for(timeout=10000)
-            await tweet_compose.click()
-            await asyncio.sleep(1)
-            
-            # Clear and type the tweet
-            await tweet_compose.clear()
-            await tweet_compose.fill(tweet_text)
-            await asyncio.sleep(2)
-            
-            # Try multiple selectors for the post button
-            post_button_selectors = [
-                '[data-testid="tweetButtonInline"]',
-                '[data-testid="tweetButton"]',
-                'button[data-testid="tweetButtonInline"]',
-                'button[data-testid="tweetButton"]',
-                '[role="button"][data-testid="tweetButtonInline"]',
-                '[role="button"][data-testid="tweetButton"]'
-            ]
-            
-            for selector in post_button_selectors:
-                try:
-                    post_button = self.page.locator(selector)
-                    await post_button.wait_for(timeout=5000)
-                    
-                    # Scroll into view and click
-                    await post_button.scroll_into_view_if_needed()
-                    await asyncio.sleep(1)
-                    
-                    # Try regular click first
-                    try:
-                        await post_button.click()
-                    except:
-                        # If regular click fails, try force click
-                        await post_button.click(force=True)
-                    
-                    await asyncio.sleep(3)
-                    logger.info("Method 1 successful!")
-                    return True
-                    
-                except:
-                    continue
-            
-            return False
+    async def post_tweet(self, page: Page, tweet_text: str) -> bool:
+        """
+        Post a tweet to Twitter with multiple fallback methods
+        
+        Args:
+            page: The worker page to post from
+            tweet_text: The text content of the tweet
             
-        except Exception as e:
-            logger.error(f"Method 1 failed: {e}")
-            return False
-    
-    async def _try_compose_method_2(self, tweet_text: str) -> bool:
-        """Method 2: Alternative selectors"""
+        Returns:
+            bool: True if successful, False otherwise
+        """
         try:
-            logger.info("Trying compose method 2...")
-            
-            # Try different compose area selectors
-            compose_selectors = [
-                '[placeholder="What is happening?!"]',
-                '[placeholder="What\'s happening?"]',
-                '[aria-label="Tweet text"]',
-                '.public-DraftEditor-content',
-                '[contenteditable="true"]'
-            ]
-            
-            tweet_compose = None
-            for selector in compose_selectors:
-                try:
-                    tweet_compose = self.page.locator(selector)
-                    await tweet_compose.wait_for(timeout=5000)
-                    break
-                except:
-                    continue
+            logger.debug("Posting tweet: %s...", tweet_text[:50])
             
-            if not tweet_compose:
-                return False
+            # Stay on the already-loaded home page; open the compose modal if the inline box is gone
+            if not await self._loc(page, _COMPOSE_SELECTOR).is_visible():
+                await self._loc(page, _NEW_TWEET_BUTTON).click()
             
-            # Click and enter text
-            await tweet_compose.click()
-            await asyncio.sleep(1)
-            await tweet_compose.clear()
-            await tweet_compose.fill(tweet_text)
-            await asyncio.sleep(2)
-            
-            # Try to find and click post button
-            post_selectors = [
-                'button[data-testid="tweetButtonInline"]',
-                'button[data-testid="tweetButton"]',
-                'xpath=//button[contains(text(), "Post")]',
-                'xpath=//button[contains(text(), "Tweet")]',
-                'xpath=//*[@role="button" and contains(text(), "Post")]',
-                'xpath=//*[@role="button" and contains(text(), "Tweet")]'
-            ]
-            
-            for selector in post_selectors:
-                try:
-                    post_button = self.page.locator(selector)
-                    await post_button.wait_for(timeout=5000)
-                    
-                    # Try clicking
-                    try:
-                        await post_button.click()
-                    except:
-                        await post_button.click(force=True)
-                    
-                    await asyncio.sleep(3)
-                    logger.info("Method 2 successful!")
+            for strategy in STRATEGIES:
+                if await self._compose_and_post(page, tweet_text, strategy):
                     return True
-                    
-                except:
-                    continue
             
+            logger.error("All posting methods failed")
             return False
             
         except Exception as e:
-            logger.error(f"Method 2 failed: {e}")
+            logger.error("Failed to post tweet: %s", e)
             return False
     
-    async def _try_compose_method_3(self, tweet_text: str) -> bool:
-        """Method 3: Using keyboard shortcuts"""
+    def _loc(self, page: Page, selector: str) -> Locator:
+        """Return a cached Locator for this page and selector"""
+        key = (id(page), selector)
+        locator = self._loc_cache.get(key)
+        if locator is None:
+            locator = self._loc_cache[key] = page.locator(selector)
+        return locator
+    
+    def _loc_any(self, page: Page, selectors: Tuple[str, ...]) -> Locator:
+        """Return a cached Locator matching the first element of any of the selectors"""
+        key = (id(page), selectors)
+        locator = self._loc_cache.get(key)
+        if locator is None:
+            locator = self._loc(page, selectors[0])
+            for selector in selectors[1:]:
+                locator = locator.or_(self._loc(page, selector))
+            locator = self._loc_cache[key] = locator.first
+        return locator
+    
+    async def _compose_and_post(self, page: Page, tweet_text: str, strategy: Strategy) -> bool:
+        """
+        Type the tweet into the compose box and submit it using one strategy
+        
+        Returns:
+            bool: True if the tweet was submitted, False to fall through to the next strategy
+        """
         try:
-            logger.info("Trying compose method 3 (keyboard shortcuts)...")
-            
-            # Find compose area with multiple selectors
-            compose_selectors = [
-                '[data-testid="tweetTextarea_0"]',
-                '[placeholder*="What"]',
-                '[contenteditable="true"]'
-            ]
+            logger.debug("Trying compose strategy: %s...", strategy.name)
             
-            tweet_compose = None
-            for selector in compose_selectors:
-                try:
-                    tweet_compose = self.page.locator(selector)
-                    await tweet_compose.wait_for(timeout=5000)
-                    break
-                except:
-                    continue
-            
-            if not tweet_compose:
-                return False
+            # Race all compose selectors in a single wait
+            tweet_compose = self._loc_any(page, strategy.compose)
+            await tweet_compose.wait_for(state="visible", timeout=5000)
             
-            # Click and enter text
-            await tweet_compose.click()
-            await asyncio.sleep(1)
+            # Click, clear and type the tweet; a DOM click covers overlays intercepting the pointer
+            try:
+                await tweet_compose.click(timeout=3000)
+            except PlaywrightTimeoutError:
+                await tweet_compose.dispatch_event("click")
             await tweet_compose.clear()
             await tweet_compose.fill(tweet_text)
-            await asyncio.sleep(2)
             
-            # Use Ctrl+Enter to post (Twitter keyboard shortcut)
-            await self.page.keyboard.press("Control+Enter")
+            if not strategy.post_button:
+                # Use Ctrl+Enter to post (Twitter keyboard shortcut)
+                await expect(tweet_compose).to_have_text(tweet_text, timeout=5000)
+                await page.keyboard.press("Control+Enter")
+                
+                if not await self._wait_for_post_confirmation(page):
+                    # Text still in the box - the shortcut was swallowed, so submit this same
+                    # draft with the button rather than re-filling it in another strategy
+                    remaining = (await tweet_compose.text_content() or "").strip()
+                    if remaining and remaining == tweet_text.strip():
+                        logger.warning("Ctrl+Enter did not submit, clicking the post button instead")
+                        await self._click_post_button(page, _POST_BTN_SELECTORS + _POST_BTN_SELECTORS_ALT)
+                    else:
+                        # Box changed but no toast - the post is likely in flight; retrying would double-submit
+                        logger.warning("No post confirmation after Ctrl+Enter, assuming the tweet was sent")
+            else:
+                await self._click_post_button(page, strategy.post_button)
             
-            await asyncio.sleep(3)
-            logger.info("Method 3 (keyboard shortcut) successful!")
+            logger.info("Compose strategy '%s' successful!", strategy.name)
             return True
             
         except Exception as e:
-            logger.error(f"Method 3 failed: {e}")
+            logger.error("Compose strategy '%s' failed: %s", strategy.name, e)
             return False
     
-    def load_tweets_from_json(self, json_file_path: str) -> List[Dict]:
-        """Load tweets from JSON file"""
+    async def _click_post_button(self, page: Page, selectors: Tuple[str, ...]):
+        """Click the first matching post button once it enables, then wait for confirmation"""
+        # Race all post button selectors in a single wait
+        post_button = self._loc_any(page, selectors)
+        await post_button.wait_for(timeout=5000)
+        
+        # Scroll into view and click once the button enables
+        await post_button.scroll_into_view_if_needed()
+        await expect(post_button).to_be_enabled(timeout=5000)
+        
+        # Try regular click first, then a single DOM click if something intercepts it
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as file:
-                tweets_data = json.load(file)
-            
-            logger.info(f"Loaded {len(tweets_data)} tweets from {json_file_path}")
-            return tweets_data
-            
+            await post_button.click(timeout=3000)
+        except PlaywrightTimeoutError:
+            await post_button.dispatch_event("click")
+        
+        await self._wait_for_post_confirmation(page)
+    
+    async def _prepare_next_compose(self, page: Page):
+        """Get the compose box open and focused ahead of the next tweet"""
+        try:
+            tweet_compose = self._loc(page, _COMPOSE_SELECTOR)
+            if not await tweet_compose.is_visible():
+                await self._loc(page, _NEW_TWEET_BUTTON).click()
+            await tweet_compose.wait_for(state="visible", timeout=15000)
+            await tweet_compose.focus()
         except Exception as e:
-            logger.error(f"Failed to load tweets from JSON: {e}")
-            return []
+            # post_tweet opens the compose box itself if this didn't work out
+            logger.warning("Could not prepare compose box: %s", e)
     
-    async def run_bot(self, json_file_path: str, post_interval: int = 10, max_tweets: int = None):
+    async def _wait_for_post_confirmation(self, page: Page) -> bool:
+        """Wait until Twitter shows its toast or clears the compose box after a post"""
+        try:
+            await page.wait_for_function(
+                """() => !!document.querySelector('[data-testid="toast"]') ||
+                       (document.querySelector('[data-testid="tweetTextarea_0"]')?.textContent ?? '') === ''""",
+                timeout=5000
+            )
+            return True
+        except PlaywrightTimeoutError:
+            logger.warning("No post confirmation seen within 5 seconds")
+            return False
+    
+    def iter_tweets(self, json_file_path: str) -> Iterator[Dict]:
+        """Stream tweets one at a time from the top-level array of a JSON file"""
+        with open(json_file_path, 'rb') as file:
+            yield from ijson.items(file, 'item')
+    
+    async def run_bot(self, json_file_path: str, post_interval: int = 10, max_tweets: int = None,
+                      concurrency: int = 1):
         """
         Run the Twitter bot to post tweets from JSON file
         
         Args:
             json_file_path: Path to the JSON file containing tweets
-            post_interval: Interval between posts in seconds (default: 10)
+            post_interval: Interval between posts in seconds, per worker (default: 10)
             max_tweets: Maximum number of tweets to post (default: all)
+            concurrency: Number of browser contexts posting in parallel (default: 1)
         """
         try:
             # Setup browser
             await self.setup_browser()
             
-            # Load tweets from JSON
-            tweets_data = self.load_tweets_from_json(json_file_path)
+            # Stream tweets from JSON, limited if specified
+            tweets = itertools.islice(self.iter_tweets(json_file_path), max_tweets)
+            try:
+                first_tweet = next(tweets, None)
+            except Exception as e:
+                logger.error("Failed to load tweets from JSON: %s", e)
+                return
             
-            if not tweets_data:
+            if first_tweet is None:
                 logger.error("No tweets loaded. Exiting...")
                 return
             
-            # Limit tweets if specified
-            if max_tweets:
-                tweets_data = tweets_data[:max_tweets]
-            
-            # Login to Twitter
-            await self.login_to_twitter()
-            
-            # Post tweets
-            successful_posts = 0
-            failed_posts = 0
-            
-            for i, tweet_data in enumerate(tweets_data, 1):
+            # Login to Twitter once, then share the session with the other workers
+            context, page = await self._make_worker_context()
+            await self.login_to_twitter(page)
+            # Kept in memory for the other workers; written to disk only in fresh-browser mode
+            self.storage_state = await context.storage_state(path=self.state_file)
+            if self.state_file:
+                self._saved_auth = await self._auth_cookies(context)
+            
+            pages = [page]
+            for _ in range(concurrency - 1):
+                _, worker_page = await self._make_worker_context()
+                await self._open_home(worker_page)
+                pages.append(worker_page)
+            
+            # Post tweets - a bounded queue fed lazily from the file
+            tweet_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+            stats = {'loaded': 0, 'successful': 0, 'failed': 0}
+            
+            async def producer():
                 try:
-                    # Get the complete tweet with hashtags
-                    tweet_text = tweet_data.get('tweet_with_hashtags', tweet_data.get('tweet', ''))
+                    for i, tweet_data in enumerate(itertools.chain([first_tweet], tweets), 1):
+                        stats['loaded'] = i
+                        
+                        # Get the complete tweet with hashtags
+                        tweet_text = tweet_data.get('tweet_with_hashtags', tweet_data.get('tweet', ''))
+                        
+                        if not tweet_text:
+                            logger.warning("Empty tweet at index %s, skipping...", i)
+                            continue
+                        
+                        # Normalize like Twitter's counter does, then check the length before a worker picks it up
+                        tweet_text = unicodedata.normalize("NFC", tweet_text)
+                        tweet = Tweet(text=_trim(tweet_text))
+                        if tweet.text != tweet_text:
+                            logger.warning("Tweet %s is too long (%s chars), truncating...", i, len(tweet_text))
+                        
+                        await tweet_queue.put((i, tweet))
+                except Exception as e:
+                    logger.error("Failed to load tweets from JSON: %s", e)
+                finally:
+                    # One stop marker per worker
+                    for _ in pages:
+                        await tweet_queue.put(None)
+                
+                logger.info("Loaded %s tweets from %s", stats['loaded'], json_file_path)
+            
+            async def worker(worker_page: Page):
+                has_posted = False
+                prep_task: Optional[asyncio.Task] = None
+                while True:
+                    item = await tweet_queue.get()
+                    if item is None:
+                        if prep_task is not None:
+                            prep_task.cancel()
+                        return
+                    i, tweet = item
                     
-                    if not tweet_text:
-                        logger.warning(f"Empty tweet at index {i}, skipping...")
+                    try:
+                        # Wait between this worker's consecutive tweets
+                        if has_posted:
+                            logger.info("Waiting %s seconds before next tweet...", post_interval)
+                            await asyncio.sleep(post_interval)
+                        has_posted = True
+                        
+                        # Normally already finished during the cooldown
+                        if prep_task is not None:
+                            await prep_task
+                            prep_task = None
+                        
+                        logger.info("Posting tweet %d", i)
+                        
+                        # Post the tweet - API first when configured, then the UI
+                        posted = bool(self.api_bearer_token) and await self.post_tweet_api(worker_page.context, tweet.text)
+                        if posted or await self.post_tweet(worker_page, tweet.text):
+                            stats['successful'] += 1
+                            logger.info("✅ Tweet %s posted successfully", i)
+                            
+                            # Re-save the session only if the auth cookies rolled
+                            if self.state_file:
+                                auth = await self._auth_cookies(worker_page.context)
+                                if auth != self._saved_auth:
+                                    self._saved_auth = auth
+                                    await worker_page.context.storage_state(path=self.state_file)
+                        else:
+                            stats['failed'] += 1
+                            logger.error("❌ Failed to post tweet %s", i)
+                        
+                        # Open the compose box for the next tweet while this worker cools down
+                        prep_task = asyncio.create_task(self._prepare_next_compose(worker_page))
+                        
+                    except Exception as e:
+                        stats['failed'] += 1
+                        logger.error("Error posting tweet %s: %s", i, e)
                         continue
-                    
-                    # Check tweet length (Twitter limit is 280 characters)
-                    if len(tweet_text) > 280:
-                        logger.warning(f"Tweet {i} is too long ({len(tweet_text)} chars), truncating...")
-                        tweet_text = tweet_text[:277] + "..."
-                    
-                    logger.info(f"Posting tweet {i}/{len(tweets_data)}")
-                    
-                    # Post the tweet
-                    if await self.post_tweet(tweet_text):
-                        successful_posts += 1
-                        logger.info(f"✅ Tweet {i} posted successfully")
-                    else:
-                        failed_posts += 1
-                        logger.error(f"❌ Failed to post tweet {i}")
-                    
-                    # Wait before posting the next tweet (except for the last one)
-                    if i < len(tweets_data):
-                        logger.info(f"Waiting {post_interval} seconds before next tweet...")
-                        await asyncio.sleep(post_interval)
-                    
-                except Exception as e:
-                    failed_posts += 1
-                    logger.error(f"Error posting tweet {i}: {e}")
-                    continue
+            
+            await asyncio.gather(producer(), *[asyncio.create_task(worker(p)) for p in pages])
             
             # Summary
-            logger.info(f"Bot completed! Successfully posted: {successful_posts}, Failed: {failed_posts}")
+            logger.info("Bot completed! Successfully posted: %s, Failed: %s", stats['successful'], stats['failed'])
             
         except Exception as e:
-            logger.error(f"Bot execution failed: {e}")
+            logger.error("Bot execution failed: %s", e)
             
         finally:
-            # Keep browser open for a few seconds before closing
-            logger.info("Keeping browser open for 10 seconds...")
-            await asyncio.sleep(10)
             await self.quit()
     
     async def quit(self):
-        """Close the browser"""
+        """Close all worker contexts and the browser"""
         try:
-            if self.page:
-                await self.page.close()
-            if self.context:
-                await self.context.close()
+            for context in self.contexts:
+                await context.close()
+            self.contexts = []
+            self._unused_pages = []
+            self._loc_cache.clear()
             if self.browser:
                 await self.browser.close()
+                self.browser = None
             if self.playwright:
                 await self.playwright.stop()
+                self.playwright = None
             logger.info("Browser closed")
         except Exception as e:
-            logger.error(f"Error closing browser: {e}")
+            logger.error("Error closing browser: %s", e)
+
+async def serve_shared_browser(port: int = 9222, user_data_dir: str = ".pw_shared_profile",
+                               headless: bool = True):
+    """
+    Run one Chromium that several bot processes share over CDP
+    
+    Start it once with `python posting_1.py --serve-browser`, then give each bot
+    cdp_endpoint="http://localhost:<port>". Every bot opens its own context, so
+    separate accounts keep separate cookies while sharing one browser process.
+    """
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=user_data_dir,
+            headless=headless,
+            args=_launch_args(headless) + [f"--remote-debugging-port={port}"]
+        )
+        logger.info("Shared browser listening on http://localhost:%d (Ctrl+C to stop)", port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await context.close()
 
 async def main():
     """Main function to run the Twitter bot"""
@@ -431,9 +756,12 @@ async def main():
     TWITTER_USERNAME = "acc"  # Your Twitter username or email
     TWITTER_PASSWORD = "password"             # Your Twitter password
     JSON_FILE_PATH = r"C:\Users\ABHAYEYSVS\Desktop\Automation\generated_tweets.json"            # Path to your tweets JSON file
-    POST_INTERVAL = 10                                  # Seconds between tweets
+    POST_INTERVAL = 10                                  # Seconds between tweets, per worker
     MAX_TWEETS = None                                   # Maximum tweets to post (None = all)
+    CONCURRENCY = 1                                     # Browser contexts posting in parallel (N workers = N x the posting rate)
     HEADLESS = False                                    # Set to True to run without browser UI
+    API_BEARER_TOKEN = None                             # Web client bearer token to post via API (None = UI only)
+    CDP_ENDPOINT = None                                 # e.g. "http://localhost:9222" to use a shared browser (None = own browser)
     
     # Validate configuration
     if TWITTER_USERNAME == "your_twitter_username_or_email" or TWITTER_PASSWORD == "your_twitter_password":
@@ -444,7 +772,9 @@ async def main():
     bot = TwitterBot(
         username=TWITTER_USERNAME,
         password=TWITTER_PASSWORD,
-        headless=HEADLESS
+        headless=HEADLESS,
+        api_bearer_token=API_BEARER_TOKEN,
+        cdp_endpoint=CDP_ENDPOINT
     )
     
     try:
@@ -452,13 +782,14 @@ async def main():
         await bot.run_bot(
             json_file_path=JSON_FILE_PATH,
             post_interval=POST_INTERVAL,
-            max_tweets=MAX_TWEETS
+            max_tweets=MAX_TWEETS,
+            concurrency=CONCURRENCY
         )
         
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
-        logger.error(f"Bot crashed: {e}")
+        logger.error("Bot crashed: %s", e)
     finally:
         await bot.quit()
 
@@ -466,19 +797,67 @@ if __name__ == "__main__":
     # First, check if browsers are installed
     import subprocess
     import sys
+    from pathlib import Path
+    import playwright
     
-    print("Checking Playwright browser installation...")
-    try:
-        result = subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], 
-                              capture_output=True, text=True, timeout=300)
-        if result.returncode == 0:
-            print("✅ Playwright browsers installed successfully!")
+    # Only run the installer once per Playwright version
+    marker = Path.home() / ".cache" / "twitter_bot" / f"pw_installed_v{playwright.__version__}"
+    
+    # No marker yet? The exact Chromium builds this Playwright version launches may still be on
+    # disk - read their revisions from the bundled browsers.json and look for Playwright's own
+    # INSTALLATION_COMPLETE marker, without starting the driver
+    if not marker.exists():
+        package_root = Path(playwright.__file__).parent / "driver" / "package"
+        browsers_env = os.environ.get("PLAYWRIGHT_BROWSERS_PATH")
+        if browsers_env == "0":
+            browsers_path = package_root / ".local-browsers"
+        elif browsers_env:
+            browsers_path = Path(browsers_env)
+        elif sys.platform == "win32":
+            browsers_path = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local")) / "ms-playwright"
+        elif sys.platform == "darwin":
+            browsers_path = Path.home() / "Library" / "Caches" / "ms-playwright"
         else:
-            print("⚠️ There might be an issue with browser installation, but continuing...")
-    except subprocess.TimeoutExpired:
-        print("⚠️ Browser installation is taking longer than expected, but continuing...")
-    except Exception as e:
-        print(f"⚠️ Could not install browsers automatically: {e}")
-        print("Please run manually: playwright install chromium")
+            browsers_path = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "ms-playwright"
+        
+        try:
+            with open(package_root / "browsers.json", encoding="utf-8") as f:
+                wanted = [b for b in json.load(f)["browsers"]
+                          if b["name"] in ("chromium", "chromium-headless-shell")]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Could not read Playwright's browsers.json: %s", e)
+            wanted = []
+        
+        if wanted and all(
+            (browsers_path / f"{b['name'].replace('-', '_')}-{b['revision']}" / "INSTALLATION_COMPLETE").exists()
+            for b in wanted
+        ):
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+    
+    if not marker.exists():
+        print("Checking Playwright browser installation...")
+        try:
+            # Output streams straight to the terminal so a stalled download is visible
+            process = subprocess.Popen([sys.executable, "-m", "playwright", "install", "chromium"])
+            try:
+                returncode = process.wait(timeout=300)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                raise
+            if returncode == 0:
+                marker.parent.mkdir(parents=True, exist_ok=True)
+                marker.touch()
+                print("✅ Playwright browsers installed successfully!")
+            else:
+                print("⚠️ There might be an issue with browser installation, but continuing...")
+        except subprocess.TimeoutExpired:
+            print("⚠️ Browser installation is taking longer than expected, but continuing...")
+        except Exception as e:
+            print(f"⚠️ Could not install browsers automatically: {e}")
+            print("Please run manually: playwright install chromium")
     
-    asyncio.run(main())
\ No newline at end of file
+    if "--serve-browser" in sys.argv[1:]:
+        asyncio.run(serve_shared_browser())
+    else:
+        asyncio.run(main())